@@ -1,15 +1,88 @@
 import asyncio
+import hashlib
 import json
 import os
+import random
 import re
-import time
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
 
 import httpx
-import requests
 from fastapi import HTTPException
 
-from src.logger import log_error, log_warning
+from src.json_codec import dumps, loads
+from src.logger import log_debug, log_error, log_info, log_warning
+
+EDEN_API_KEY = os.getenv("EDEN_API_KEY")
+EDEN_API_URL = "https://api.edenai.run/v2/text/chat"
+EDEN_HEADERS = {"Authorization": f"Bearer {EDEN_API_KEY}", "Content-Type": "application/json"}
+# A heading, bold text, a bullet or a numbered item, followed by any nested emphasis, heading
+# marks or numbering, as in "- **Rating:**", "### **Rating:**" or "1. **Rating**:".
+SECTION_MARKER_RE = re.compile(r"(?:#{1,6}\s*|\*\*|[-*]\s+|\d+[.)]\s+)(?:[*#_]+\s*|\d+[.)]\s+)*")
+RESULT_CACHE_SIZE = 512
+MAX_BACKOFF = 30
+MAX_CONCURRENT_REQUESTS = 8
+MAX_PROMPT_TOKENS = 120_000
+CHARS_PER_TOKEN = 4
+MAX_RESPONSE_SIZE = 4 * 1024 * 1024
+RATING_SCALE = 10
+_RATING_RE = re.compile(r"(\d+(?:\.\d+)?)(?:\s*(?:/|out of)\s*(\d+))?")
+_RESULT_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+if not EDEN_API_KEY:
+    log_warning("EDEN_API_KEY is not set; requests to the AI service will be rejected.")
+
+
+def _strip_marker(line: str) -> Optional[str]:
+    """
+    Strips a leading section marker (heading, bold, bullet or numbered item), together with any
+    nested markup after it, from a line of AI output.
+
+    Args:
+        line (str): A single line of the AI-generated text.
+
+    Returns:
+        Optional[str]: The rest of the line after the marker, or None if the line does not start
+                       with a marker.
+
+    """
+    stripped = line.strip()
+    match = SECTION_MARKER_RE.match(stripped)
+    if match is None:
+        return None
+    return stripped[match.end():].lstrip()
+
+
+def _get_cached_result(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns a previously parsed AI result and marks it as recently used.
+
+    Args:
+        key (str): Hash of the prompt payload.
+
+    Returns:
+        Optional[Dict[str, Any]]: The cached result, or None if the payload was not analyzed yet.
+
+    """
+    result = _RESULT_CACHE.get(key)
+    if result is not None:
+        _RESULT_CACHE.move_to_end(key)
+    return result
+
+
+def _cache_result(key: str, result: Dict[str, Any]) -> None:
+    """
+    Stores a parsed AI result, evicting the least recently used entry when the cache is full.
+
+    Args:
+        key (str): Hash of the prompt payload.
+        result (Dict[str, Any]): The parsed result of the AI's response.
+
+    """
+    _RESULT_CACHE[key] = result
+    _RESULT_CACHE.move_to_end(key)
+    if len(_RESULT_CACHE) > RESULT_CACHE_SIZE:
+        _RESULT_CACHE.popitem(last=False)
 
 
 class CodeAnalyzer:
@@ -19,33 +92,40 @@ class CodeAnalyzer:
     quality of the code.
 
     Attributes:
-        EDEN_API_KEY (str): API key for EdenAI service.
         url_ai (str): URL of the EdenAI service.
-        headers (Dict[str, str]): Headers for authentication with the EdenAI service.
-        file_names (List[str]): List of file names to be analyzed.
-        prompt (Dict[str, Any]): Payload and headers for making requests to the AI service.
+        headers (Dict[str, str]): Headers for authentication with the EdenAI service, shared by
+                                  all analyzers and not to be mutated.
+        file_names (Tuple[str, ...]): Names of the files to be analyzed.
+        prompts (List[Dict[str, Any]]): Payload and headers of the AI request for each file.
         retries (int): Number of retries for handling rate-limiting.
         backoff_factor (int): Backoff factor for retrying failed requests.
+        client (httpx.AsyncClient): Shared HTTP client used to talk to the AI service.
 
     """
-    def __init__(self, files: List[Any], assignment_description: str, candidate_level: str):
+    def __init__(self, files: List[Any], assignment_description: str, candidate_level: str,
+                 client: httpx.AsyncClient):
         """
         Initializes the CodeAnalyzer with the given files, assignment description, and candidate
-        level.
+        level. The files are ordered by path, so a repository yields the same report whichever
+        order its files were downloaded in.
 
         Args:
             files (List[Any]): List of files from the GitHub repository.
             assignment_description (str): Description of the coding assignment.
             candidate_level (str): The experience level of the candidate (Junior, Middle, Senior).
+            client (httpx.AsyncClient): Long-lived HTTP client whose connection pool is reused
+                                        across requests.
 
         """
-        self.EDEN_API_KEY = os.getenv("EDEN_API_KEY")
-        self.url_ai = "https://api.edenai.run/v2/text/chat"
-        self.headers = {"Authorization": f"Bearer {self.EDEN_API_KEY}"}
-        self.file_names = [file.name for file in files]
-        self.prompt = self.make_prompt(files, assignment_description, candidate_level)
+        self.url_ai = EDEN_API_URL
+        self.headers = EDEN_HEADERS
+        files = sorted(files, key=lambda file: file.path)
+        self.file_names = tuple(file.name for file in files)
+        self.prompts = [self.make_prompt([file], assignment_description, candidate_level)
+                        for file in files]
         self.retries = 3
         self.backoff_factor = 2
+        self.client = client
 
     def make_prompt(self, files: List[Any], assignment_description: str,
                     candidate_level: str) -> Dict[str, Any]:
@@ -59,15 +139,17 @@ class CodeAnalyzer:
             candidate_level (str): The experience level of the candidate (Junior, Middle, Senior).
 
         Returns:
-            Dict[str, Any]: Dictionary containing the headers and payload for the AI request.
+            Dict[str, Any]: Dictionary containing the headers, payload and pre-serialized body for
+                            the AI request, and the names of the files it covers.
 
         """
+        file_listing = "\n".join(f"{file.path}\n{file.content}" for file in files)
         prompt = f"""
         You are analyzing code for a coding assignment. The level is {candidate_level}.
         The assignment description is: {assignment_description}
 
         These are the files:
-        {files}
+        {file_listing}
 
         Make sure to include the following separate sections in your response:
         - Rating: Provide a rating for the code.
@@ -82,16 +164,20 @@ class CodeAnalyzer:
             "max_tokens": 3000,
             "fallback_providers": ""
         }
-        return {"headers": self.headers, "payload": payload}
+        return {"headers": self.headers,
+                "payload": payload,
+                "body": dumps(payload),
+                "file_names": tuple(file.name for file in files)}
 
 
-    def parse_result(self, result: Dict[str, Any], file_names: List[str]) -> Dict[str, Any]:
+    def parse_result(self, result: Dict[str, Any],
+                     file_names: Sequence[str]) -> Dict[str, Any]:
         """
         Parses the AI service response and extracts key sections such as rating and conclusion.
 
         Args:
             result (Dict[str, Any]): The raw result from the AI service.
-            file_names (List[str]): List of file names to include in the final report.
+            file_names (Sequence[str]): File names to include in the final report.
 
         Returns:
             Dict[str, Any]: A dictionary containing the parsed results including downsides/comments,
@@ -105,7 +191,7 @@ class CodeAnalyzer:
         conclusion = self.extract_section(generated_text, "Conclusion")
 
         parsed_result = {
-            "Found files": file_names,
+            "Found files": list(file_names),
             "Downsides/Comments": generated_text,
             "Rating": rating,
             "Conclusion": conclusion
@@ -115,8 +201,9 @@ class CodeAnalyzer:
 
     def extract_section(self, text: str, section_name: str) -> str:
         """
-        Extracts a specific section (like Rating or Conclusion) from the AI response text using
-        regular expressions.
+        Extracts a specific section (like Rating or Conclusion) from the AI response text by
+        scanning its lines for a marker-prefixed header. The section runs until the next
+        marker-prefixed line or the end of the text.
 
         Args:
             text (str): The AI-generated text to parse.
@@ -126,73 +213,229 @@ class CodeAnalyzer:
             str: The extracted section or a default message if not found.
 
         """
-        # TODO: Optimize the regular expesion
-        pattern = re.compile(rf"(?:###?\s*|\*\*|-\s*){section_name}[:*]?\s*(.*?)(?=\n(?:###?|\*\*|-\s*)|\Z)", re.DOTALL)
-
-        match = pattern.search(text)
-        if match:
-            print("match - ", match)
-            return match.group(1).strip()
+        buffer = None
+        for line in text.splitlines():
+            rest = _strip_marker(line)
+            if buffer is None:
+                if rest is not None and rest.startswith(section_name):
+                    buffer = [rest[len(section_name):].lstrip(":*").strip()]
+            elif rest is not None:
+                break
+            else:
+                buffer.append(line)
+        if buffer is not None:
+            return "\n".join(buffer).strip()
         return f"No {section_name.lower()} available"
 
 
     async def start(self) -> Dict[str, Any]:
         """
-        Starts the code analysis by sending requests to the AI service. Retries in case of
-        rate-limiting.
+        Starts the code analysis by sending one request per file to the AI service concurrently,
+        then merges the per-file reviews into a single result.
+
+        Returns:
+            Dict[str, Any]: Merged result of the AI's responses.
+
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        results = await asyncio.gather(*(self._analyze(prompt, semaphore)
+                                         for prompt in self.prompts),
+                                       return_exceptions=True)
+        reviews = [result for result in results if not isinstance(result, BaseException)]
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors and not reviews:
+            raise errors[0]
+        for error in errors:
+            log_warning(f"Skipping a file review that failed: {str(error)}")
+        return self.merge_results(reviews)
+
+    async def _analyze(self, prompt: Dict[str, Any],
+                       semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Reviews a single prompt. Retries in case of rate-limiting, waiting for the server's
+        Retry-After hint when given and for an exponential backoff with full jitter otherwise.
+        Results are cached by prompt body, so an unchanged file is not sent again. Prompts that
+        cannot fit the model's context are rejected without calling the AI service.
+
+        Args:
+            prompt (Dict[str, Any]): Payload and headers of the AI request.
+            semaphore (asyncio.Semaphore): Caps the number of requests in flight.
 
         Returns:
             Dict[str, Any]: Parsed result of the AI's response.
 
         """
-        result = None
-        for attempt in range(self.retries):
-            try:
-                result = await self._send_request()
-                if result:
-                    break
-            except HTTPException as e:
-                if e.status_code == 429 and attempt < self.retries - 1:
-                    log_warning("AI service rate limit exceeded. Retrying...")
-                    await asyncio.sleep(self.backoff_factor ** attempt)
-                else:
-                    raise e
+        key = hashlib.sha256(prompt["body"]).hexdigest()
+        result = _get_cached_result(key)
+        if result is not None:
+            log_info("Returning cached AI review.")
+            return result
+
+        approx_tokens = len(prompt["payload"]["text"]) // CHARS_PER_TOKEN
+        if approx_tokens > MAX_PROMPT_TOKENS:
+            log_warning(f"Prompt for {', '.join(prompt['file_names'])} is too large: "
+                        f"~{approx_tokens} tokens.")
+            raise HTTPException(status_code=413,
+                                detail=f"Prompt too large: ~{approx_tokens} tokens exceeds the "
+                                       f"{MAX_PROMPT_TOKENS} token limit.")
+
+        async with semaphore:
+            for attempt in range(self.retries):
+                try:
+                    result = await self._send_request(prompt)
+                    if result:
+                        break
+                except HTTPException as e:
+                    if e.status_code == 429 and attempt < self.retries - 1:
+                        log_warning("AI service rate limit exceeded. Retrying...")
+                        await asyncio.sleep(self._retry_delay(attempt, e.headers))
+                    else:
+                        raise e
+        if result:
+            _cache_result(key, result)
         return result
 
-    async def _send_request(self) -> Dict[str, Any]:
+    def merge_results(self, reviews: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merges the per-file reviews: comments and conclusions are concatenated under their file
+        names and the ratings are averaged.
+
+        Args:
+            reviews (List[Dict[str, Any]]): Parsed results of the per-file AI responses.
+
+        Returns:
+            Dict[str, Any]: A dictionary in the same format as parse_result, covering all files.
+
+        """
+        if len(self.prompts) == 1:
+            return {**reviews[0], "Found files": list(self.file_names)}
+
+        comments = self._join_sections(reviews, "Downsides/Comments")
+        conclusion = self._join_sections(reviews, "Conclusion")
+        return {
+            "Found files": list(self.file_names),
+            "Downsides/Comments": comments or "No suggestion available",
+            "Rating": self.average_rating([review["Rating"] for review in reviews]),
+            "Conclusion": conclusion or "No conclusion available"
+        }
+
+    def _join_sections(self, reviews: List[Dict[str, Any]], section: str) -> str:
+        """
+        Concatenates one section of several reviews, each under the names of its files.
+
+        Args:
+            reviews (List[Dict[str, Any]]): Parsed results of the per-file AI responses.
+            section (str): Key of the section to join.
+
+        Returns:
+            str: The labelled sections separated by blank lines.
+
+        """
+        return "\n\n".join(f"{', '.join(review['Found files'])}:\n{review[section]}"
+                             for review in reviews)
+
+    def average_rating(self, ratings: List[str]) -> str:
+        """
+        Averages ratings such as "8/10" or "4 out of 5", normalized to RATING_SCALE. A bare number
+        is taken to already be on that scale.
+
+        Args:
+            ratings (List[str]): Rating sections extracted from the AI responses.
+
+        Returns:
+            str: The average rating, or a default message if no rating contains a number.
+
+        """
+        scores = []
+        for rating in ratings:
+            match = _RATING_RE.search(rating)
+            if match:
+                scale = float(match.group(2) or RATING_SCALE) or RATING_SCALE
+                scores.append(float(match.group(1)) * RATING_SCALE / scale)
+        if not scores:
+            return "No rating available"
+        return f"{sum(scores) / len(scores):.1f}/{RATING_SCALE}"
+
+    def _retry_delay(self, attempt: int, headers: Optional[Dict[str, str]]) -> float:
+        """
+        Computes how long to wait before the next attempt.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that failed.
+            headers (Optional[Dict[str, str]]): Headers of the rate-limit error, if any.
+
+        Returns:
+            float: Delay in seconds, capped at MAX_BACKOFF.
+
+        """
+        retry_after = (headers or {}).get("Retry-After")
+        if retry_after:
+            try:
+                return min(MAX_BACKOFF, max(0.0, float(retry_after)))
+            except ValueError:
+                log_warning(f"Ignoring non-numeric Retry-After header: {retry_after}")
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff_factor * 2 ** attempt))
+
+    async def _read_body(self, response: httpx.Response) -> bytes:
+        """
+        Reads a streamed response body, refusing to buffer more than MAX_RESPONSE_SIZE bytes.
+
+        Args:
+            response (httpx.Response): The streamed response of the AI service.
+
+        Returns:
+            bytes: The response body.
+
+        """
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > MAX_RESPONSE_SIZE:
+                message = f"AI service response exceeds {MAX_RESPONSE_SIZE} bytes."
+                log_error(message)
+                raise HTTPException(status_code=502, detail=message)
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def _send_request(self, prompt: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sends a request to the AI service and handles its response, including rate-limiting and
         errors.
 
+        Args:
+            prompt (Dict[str, Any]): Payload and headers of the AI request.
+
         Returns:
             Dict[str, Any]: Parsed result of the AI's response.
 
         """
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(self.url_ai, json=self.prompt["payload"],
-                                             headers=self.prompt["headers"])
+        try:
+            async with self.client.stream("POST", self.url_ai, content=prompt["body"],
+                                          headers=prompt["headers"]) as response:
                 if response.status_code == 200:
-                    print(response.text)
-                    result = json.loads(response.text)
-                    return self.parse_result(result, self.file_names)
+                    result = loads(await self._read_body(response))
+                    log_debug("AI service response: %s", result)
+                    return self.parse_result(result, prompt["file_names"])
                 elif response.status_code == 429:
-                    log_warning("AI service rate limit exceeded. Retrying...")
-                    time.sleep(self.backoff_factor ** 2)
-                    raise HTTPException(status_code=429, detail="AI service rate limit exceeded.")
+                    retry_after = response.headers.get("Retry-After")
+                    headers = {"Retry-After": retry_after} if retry_after else None
+                    raise HTTPException(status_code=429, detail="AI service rate limit exceeded.",
+                                        headers=headers)
                 else:
-                    log_error(f"AI service returned an error: {response.status_code} - "
-                              f"{response.text}")
-                    raise HTTPException(status_code=response.status_code, detail=response.text)
-            except requests.RequestException as e:
-                log_error(f"Failed to communicate with the AI service: {str(e)}")
-                time.sleep(self.backoff_factor ** 2)
-                raise HTTPException(status_code=502,
-                                    detail=f"Failed to communicate with the AI service: {str(e)}")
-            except json.JSONDecodeError as e:
-                log_error(f"Invalid response format from AI service: {str(e)}")
-                raise HTTPException(status_code=500,
-                                    detail=f"Invalid response format from AI service: {str(e)}")
-            except Exception as e:
-                log_error(f"Error analyzing code: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Error analyzing code: {str(e)}")
+                    detail = (await self._read_body(response)).decode("utf-8", errors="replace")
+                    log_error(f"AI service returned an error: {response.status_code} - {detail}")
+                    raise HTTPException(status_code=response.status_code, detail=detail)
+        except httpx.RequestError as e:
+            log_error(f"Failed to communicate with the AI service: {str(e)}")
+            raise HTTPException(status_code=502,
+                                detail=f"Failed to communicate with the AI service: {str(e)}")
+        except json.JSONDecodeError as e:
+            log_error(f"Invalid response format from AI service: {str(e)}")
+            raise HTTPException(status_code=500,
+                                detail=f"Invalid response format from AI service: {str(e)}")
+        except HTTPException:
+            raise
+        except Exception as e:
+            log_error(f"Error analyzing code: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error analyzing code: {str(e)}")
@@ -0,0 +1,109 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+def _unit_size(value: Any) -> int:
+    """
+    Counts every cached value as one unit, so that maxsize limits the number of entries.
+
+    Args:
+        value (Any): The cached value.
+
+    Returns:
+        int: Always 1.
+
+    """
+    return 1
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache whose entries expire a fixed time after they were stored. When the
+    cache is full, the least recently used entries are evicted.
+
+    The bound is the total size of the entries as measured by getsizeof, which by default counts
+    every entry as 1. With getsizeof=len, for example, maxsize limits the cached bytes instead of
+    the number of entries; a value larger than maxsize on its own is not cached at all.
+
+    Attributes:
+        maxsize (int): Maximum total size of the entries kept.
+        ttl (float): Time to live of an entry, in seconds.
+        currsize (int): Total size of the entries currently kept.
+
+    """
+    def __init__(self, maxsize: int, ttl: float,
+                 getsizeof: Optional[Callable[[Any], int]] = None):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): Maximum total size of the entries kept.
+            ttl (float): Time to live of an entry, in seconds.
+            getsizeof (Optional[Callable[[Any], int]]): Returns the size of a value. Defaults to
+                                                         counting every value as 1.
+
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.currsize = 0
+        self._getsizeof = getsizeof or _unit_size
+        self._data: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Returns the value stored under the key and marks it as recently used.
+
+        Args:
+            key (Hashable): The cache key.
+            default (Optional[Any]): Value returned when the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or the default.
+
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value, _ = item
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            self._remove(key)
+        size = self._getsizeof(value)
+        if size > self.maxsize:
+            return
+        self._data[key] = (time.monotonic() + self.ttl, value, size)
+        self.currsize += size
+        while self.currsize > self.maxsize:
+            self._remove(next(iter(self._data)))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Removes an entry and releases its size.
+
+        Args:
+            key (Hashable): The cache key.
+
+        """
+        self.currsize -= self._data.pop(key)[2]
+
+    def clear(self) -> None:
+        """
+        Removes all entries.
+        """
+        self._data.clear()
+        self.currsize = 0
@@ -0,0 +1,40 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serializes an object to JSON bytes, using orjson when it is installed.
+
+    Args:
+        obj (Any): The object to serialize.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def loads(data: bytes) -> Any:
+    """
+    Parses a JSON document, using orjson when it is installed. Both parsers raise a subclass of
+    json.JSONDecodeError on invalid input.
+
+    Args:
+        data (bytes): The UTF-8 encoded JSON document.
+
+    Returns:
+        Any: The parsed object.
+
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,21 +1,47 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
 
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = os.getenv("LOG_FILE", "log.log")
 
+# File writes happen on the listener's thread, so logging from a coroutine is only a queue put.
+_log_queue = queue.SimpleQueue()
+_file_handler = logging.FileHandler(LOG_FILE)
+_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+_listener = QueueListener(_log_queue, _file_handler, respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
 logging.basicConfig(
         level=LOG_LEVEL,
         format=LOG_FORMAT,
         handlers=[
-            logging.FileHandler(LOG_FILE),
+            _queue_handler,
             logging.StreamHandler()
         ])
 logger = logging.getLogger("CodeReviewAI")
 
 
+def log_debug(message: str, *args: Any) -> None:
+    """
+    Logs a debug message. Formatting arguments are only applied when DEBUG is enabled.
+
+    Args:
+        message (str): The debug message to log, optionally with %-style placeholders.
+        *args (Any): Values for the placeholders in the message.
+
+    """
+    logger.debug(message, *args)
+
+
 def log_error(message: str, exc_info: bool = True) -> None:
     """
     Logs an error message with optional exception information.
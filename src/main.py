@@ -1,13 +1,40 @@
-from typing import Literal
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Literal
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, HttpUrl, constr, field_validator
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+from pydantic import BaseModel, HttpUrl, UrlConstraints, constr, field_validator
 
 from src.analyzer import CodeAnalyzer
 from src.logger import log_error, log_info
-from src.repo_fetcher import GitHubRepositoryFetcher
+from src.repo_fetcher import GITHUB_REPO_RE, GitHubRepositoryFetcher, create_github_client
 
-app = FastAPI()
+AI_CLIENT_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+AI_CLIENT_TIMEOUT = 30.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Creates the shared HTTP clients for the AI service and GitHub, and the GitHub fetcher on top
+    of the latter, on startup and closes the clients on shutdown, so every review request reuses
+    the same keep-alive connection pools and the fetcher's token rotation state.
+
+    Args:
+        app (FastAPI): The application instance.
+
+    """
+    app.state.ai_client = httpx.AsyncClient(limits=AI_CLIENT_LIMITS, timeout=AI_CLIENT_TIMEOUT)
+    app.state.github_client = create_github_client()
+    app.state.github_fetcher = GitHubRepositoryFetcher(client=app.state.github_client)
+    try:
+        yield
+    finally:
+        await app.state.ai_client.aclose()
+        await app.state.github_client.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 class ReviewRequest(BaseModel):
@@ -17,12 +44,13 @@ class ReviewRequest(BaseModel):
     Attributes:
         assignment_description (str): Description of the assignment.
                                       Must be between 1 and 1000 characters.
-        github_repo_url (HttpUrl): GitHub repository URL.
+        github_repo_url (HttpUrl): GitHub repository URL. Must be an https URL with a host.
         candidate_level (Literal['Junior', 'Middle', 'Senior']): The candidate's experience level.
 
     """
     assignment_description: constr(min_length=1, max_length=1000)
-    github_repo_url: HttpUrl
+    github_repo_url: Annotated[HttpUrl, UrlConstraints(allowed_schemes=["https"],
+                                                       host_required=True)]
     candidate_level: Literal['Junior', 'Middle', 'Senior']
 
     @field_validator('assignment_description')
@@ -41,10 +69,11 @@ class ReviewRequest(BaseModel):
             raise ValueError('Assignment description cannot be empty or whitespace.')
         return value
 
-    @field_validator('github_repo_url')
+    @field_validator('github_repo_url', mode='after')
     def validate_github_repo_url(cls, value: HttpUrl) -> HttpUrl:
         """
-        Validates that the GitHub repository URL starts with 'https://github.com/'.
+        Validates that the GitHub repository URL names an owner and a repository on github.com,
+        so malformed URLs are rejected before any request is sent to GitHub.
 
         Args:
             value (HttpUrl): The GitHub repository URL to validate.
@@ -53,19 +82,21 @@ class ReviewRequest(BaseModel):
             HttpUrl: The validated GitHub URL.
 
         """
-        if not str(value).startswith("https://github.com/"):
-            raise ValueError('GitHub repository URL must start with "https://github.com/".')
+        if not GITHUB_REPO_RE.match(str(value)):
+            raise ValueError('GitHub repository URL must look like '
+                             '"https://github.com/<owner>/<repository>".')
         return value
 
 
 @app.post("/review")
-async def review_code(request: ReviewRequest):
+async def review_code(request: ReviewRequest, http_request: Request):
     """
     Endpoint to review the code in a GitHub repository.
 
     Args:
         request (ReviewRequest): The request containing the assignment description, GitHub URL,
                                  and candidate level.
+        http_request (Request): The raw HTTP request, used to reach the shared application state.
 
     Returns:
         dict: A dictionary with the code review results.
@@ -73,10 +104,10 @@ async def review_code(request: ReviewRequest):
     """
     try:
         log_info(f"Received review request for repository: {request.github_repo_url}")
-        git_hub_fetcher = GitHubRepositoryFetcher()
-        repo_files = await git_hub_fetcher.fetch_repo_contents(request.github_repo_url)
+        fetcher = http_request.app.state.github_fetcher
+        repo_files = [file async for file in fetcher.fetch_repo_contents(request.github_repo_url)]
         codeAnalyzer = CodeAnalyzer(repo_files, request.assignment_description,
-                                    request.candidate_level)
+                                    request.candidate_level, http_request.app.state.ai_client)
         review = await codeAnalyzer.start()
         log_info("Review completed successfully.")
         return {"review": review}
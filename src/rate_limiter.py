@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """
+    Leaky-bucket rate limiter for coroutines. At most max_rate acquisitions are granted within
+    any time_period; callers beyond that budget wait until enough capacity has leaked out.
+
+    Attributes:
+        max_rate (float): Number of acquisitions allowed per time period.
+        time_period (float): Length of the time period, in seconds.
+
+    """
+    def __init__(self, max_rate: float, time_period: float = 60):
+        """
+        Initializes the limiter with an empty bucket.
+
+        Args:
+            max_rate (float): Number of acquisitions allowed per time period.
+            time_period (float): Length of the time period, in seconds.
+
+        """
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._rate_per_sec = max_rate / time_period
+        self._level = 0.0
+        self._last_check = time.monotonic()
+
+    def _leak(self) -> None:
+        """
+        Drains the capacity that has leaked out of the bucket since the last check.
+        """
+        now = time.monotonic()
+        self._level = max(0.0, self._level - (now - self._last_check) * self._rate_per_sec)
+        self._last_check = now
+
+    async def acquire(self) -> None:
+        """
+        Waits until the bucket has room for one more acquisition, then takes it.
+        """
+        while True:
+            self._leak()
+            if self._level + 1 <= self.max_rate:
+                self._level += 1
+                return
+            await asyncio.sleep((self._level + 1 - self.max_rate) / self._rate_per_sec)
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
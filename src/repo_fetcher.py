@@ -1,165 +1,656 @@
+import asyncio
+import functools
+import hashlib
+import itertools
 import os
-from collections import namedtuple
-
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
 from fastapi import HTTPException
-from github import Auth, Github, GithubException, RateLimitExceededException
 from pydantic import HttpUrl
 
-from src.logger import log_error, log_info, log_warning
+from src.cache import TTLCache
+from src.json_codec import loads
+from src.logger import log_debug, log_error, log_info, log_warning
+from src.rate_limiter import AsyncRateLimiter
 
 MAX_CONTENT_SIZE = 1024 * 1024
+LARGE_FILE_CHUNK_SIZE = 1024 * 1024
+LARGE_FILE_DIR = "/tmp"
+FILE_IO_WORKERS = 16
 GITHUB_API_TOKEN = os.getenv("GITHUB_API_TOKEN")
-FileInfo = namedtuple("FileInfo", ["name", "path", "content"])
+GITHUB_API_TOKENS = [token.strip()
+                     for token in (os.getenv("GITHUB_API_TOKENS") or GITHUB_API_TOKEN or "")
+                     .split(",")
+                     if token.strip()]
+RATE_LIMIT_FALLBACK_WAIT = 60
+GITHUB_REQUESTS_PER_HOUR = 4500
+RATE_LIMIT_LOW_WATERMARK = 100
+MAX_RATE_LIMIT_WAIT = 60
+GITHUB_API_URL = "https://api.github.com"
+GITHUB_RAW_URL = "https://raw.githubusercontent.com"
+MAX_CONCURRENT_DOWNLOADS = 10
+ETAG_CACHE_BYTES = 32 * 1024 * 1024
+ETAG_CACHE_TTL = 600
+NOT_FOUND_CACHE_SIZE = 4096
+NOT_FOUND_CACHE_TTL = 300
+BLOB_CACHE_BYTES = 64 * 1024 * 1024
+BLOB_CACHE_TTL = 3600
+ALLOWED_SUFFIXES = frozenset({".py", ".js", ".ts", ".go", ".rs", ".java", ".c", ".h", ".cpp",
+                              ".rb", ".cs", ".md", ".yaml", ".yml", ".toml", ".json"})
+SKIP_DIRS = frozenset({"node_modules", "dist", "build", ".git", "vendor"})
+GITHUB_REPO_RE = re.compile(r"^https?://(?:www\.)?github\.com/([^/?#]+)/([^/?#]+?)(?:\.git)?"
+                            r"(?:[/?#].*)?$")
+_ETAG_CACHE = TTLCache(maxsize=ETAG_CACHE_BYTES, ttl=ETAG_CACHE_TTL,
+                       getsizeof=lambda item: len(item[1]))
+_NOT_FOUND_CACHE = TTLCache(maxsize=NOT_FOUND_CACHE_SIZE, ttl=NOT_FOUND_CACHE_TTL)
+_LARGE_FILE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+_BLOB_CACHE = TTLCache(maxsize=BLOB_CACHE_BYTES, ttl=BLOB_CACHE_TTL, getsizeof=len)
+_FILE_IO_POOL = ThreadPoolExecutor(max_workers=FILE_IO_WORKERS, thread_name_prefix="repo-io")
+
+
+@dataclass(frozen=True, order=True)
+class FileInfo:
+    """
+    A file of the repository, as handed to the analyzer.
+
+    Attributes:
+        name (str): The base name of the file.
+        path (str): The path of the file in the repository.
+        content (str): The decoded content, or a note where a large file was saved.
+
+    """
+    __slots__ = ("name", "path", "content")
+
+    name: str
+    path: str
+    content: str
+
+
+def create_github_client() -> httpx.AsyncClient:
+    """
+    Creates the pooled HTTP client used for the GitHub API and the raw file host. Keep-alive
+    connections are reused across requests, so a single client should be shared for the lifetime
+    of the application.
+
+    Returns:
+        httpx.AsyncClient: The configured client.
+
+    """
+    # httpx ignores the client's limits when a transport is given, so they go on the transport.
+    transport = httpx.AsyncHTTPTransport(retries=2,
+                                         limits=httpx.Limits(max_connections=50,
+                                                             max_keepalive_connections=20))
+    return httpx.AsyncClient(base_url=GITHUB_API_URL,
+                             headers={"Accept": "application/vnd.github+json"},
+                             timeout=httpx.Timeout(30.0),
+                             transport=transport)
+
+
+async def _run_in_pool(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Runs a blocking call in the dedicated file I/O pool. Unlike asyncio.to_thread, the pool is
+    bounded on its own, so large file writes cannot exhaust the default executor shared with the
+    rest of the application.
+
+    Args:
+        fn (Callable[..., Any]): The blocking function.
+        *args: Positional arguments for fn.
+        **kwargs: Keyword arguments for fn.
+
+    Returns:
+        Any: The return value of fn.
+
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_FILE_IO_POOL, functools.partial(fn, *args, **kwargs))
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """
+    Writes a whole buffer to a file descriptor, retrying after partial writes.
+
+    Args:
+        fd (int): The open file descriptor.
+        data (bytes): The bytes to write.
+
+    """
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _git_blob_sha(data: bytes) -> str:
+    """
+    Computes the Git blob SHA of a file's content, as listed in the repository tree.
+
+    Args:
+        data (bytes): The raw content of the file.
+
+    Returns:
+        str: The hex SHA-1 of the blob object.
+
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _raw_url(repo_name: str, ref: str, path: str) -> str:
+    """
+    Builds the raw.githubusercontent.com URL of a file. The ref and path are percent-encoded, so
+    characters such as '#', '?', '%' and spaces in a file name stay part of the path.
+
+    Args:
+        repo_name (str): The name of the repository.
+        ref (str): The branch to download the file from.
+        path (str): The path of the file in the repository.
+
+    Returns:
+        str: The URL of the raw file.
+
+    """
+    return f"{GITHUB_RAW_URL}/{repo_name}/{quote(ref, safe='')}/{quote(path)}"
+
+
+def _rate_limit_reset(headers: Optional[Mapping[str, str]]) -> float:
+    """
+    Reads the time at which the rate limit of a token resets from GitHub response headers.
+
+    Args:
+        headers (Optional[Mapping[str, str]]): Headers of the rate-limited response.
+
+    Returns:
+        float: The reset time as a UNIX timestamp. Falls back to RATE_LIMIT_FALLBACK_WAIT seconds
+               from now when the header is missing.
+
+    """
+    for key, value in (headers or {}).items():
+        if key.lower() == "x-ratelimit-reset":
+            try:
+                return float(value)
+            except ValueError:
+                break
+    return time.time() + RATE_LIMIT_FALLBACK_WAIT
 
 
 class GitHubRepositoryFetcher:
     """
     Class responsible for fetching the contents of a GitHub repository.
-    Uses the GitHub API to retrieve file contents from a repository.
+    Uses the GitHub REST API over a pooled httpx.AsyncClient to retrieve file contents from a
+    repository: the whole file listing comes from one recursive git tree request and the files
+    are then downloaded concurrently from raw.githubusercontent.com.
+
+    Requests are spread round-robin over a pool of API tokens, so the rate budget grows with the
+    number of tokens. API calls are paced client-side to GITHUB_REQUESTS_PER_HOUR per token, and
+    a token that hit or nearly hit its rate limit is skipped until the limit resets.
 
     Attributes:
-        github (Github): Instance of the GitHub API client.
+        tokens (List[Optional[str]]): GitHub API tokens; None stands for anonymous access.
+        client (httpx.AsyncClient): Async HTTP client for the GitHub API and raw file host.
 
     """
-    def __init__(self, token: str = GITHUB_API_TOKEN):
+    def __init__(self, tokens: Optional[List[str]] = None,
+                 client: Optional[httpx.AsyncClient] = None):
         """
-        Initializes the GitHubRepositoryFetcher with the provided GitHub token.
+        Initializes the GitHubRepositoryFetcher with the provided GitHub tokens.
 
         Args:
-            token (str): GitHub API token for authentication.
+            tokens (Optional[List[str]]): GitHub API tokens for authentication. Defaults to
+                                          GITHUB_API_TOKENS (comma-separated), or to
+                                          GITHUB_API_TOKEN when that is not set.
+            client (Optional[httpx.AsyncClient]): Shared HTTP client, as created by
+                                                  create_github_client. The caller stays
+                                                  responsible for closing it. Defaults to a new
+                                                  client owned by the fetcher.
 
         """
-        self.github = Github(auth=Auth.Token(token))
+        self.tokens = list(tokens if tokens is not None else GITHUB_API_TOKENS) or [None]
+        self._token_cycle = itertools.cycle(range(len(self.tokens)))
+        self._rate_limited_until: Dict[int, float] = {}
+        self._low_budget: Dict[int, Tuple[int, float]] = {}
+        self._limiter = AsyncRateLimiter(GITHUB_REQUESTS_PER_HOUR * len(self.tokens), 3600)
+        self._owns_client = client is None
+        self.client = client if client is not None else create_github_client()
+
+    async def aclose(self) -> None:
+        """
+        Closes the HTTP client and its connection pool, unless the client was injected.
+        """
+        if self._owns_client:
+            await self.client.aclose()
 
-    async def fetch_repo_contents(self, repo_url: HttpUrl) -> list:
+    async def fetch_repo_contents(self, repo_url: HttpUrl) -> AsyncIterator[FileInfo]:
         """
-        Fetches all file contents from a GitHub repository URL.
+        Fetches all file contents from a GitHub repository URL. The files are downloaded
+        concurrently and yielded as soon as each one arrives, so their order varies between runs;
+        callers that need a stable order sort them by path.
 
         Args:
             repo_url (HttpUrl): The GitHub repository URL.
 
         Returns:
-            list[FileInfo]: A list of named tuples containing file information.
+            AsyncIterator[FileInfo]: The files of the repository, in completion order.
 
         """
-        repo_name = self._extract_repo_name(repo_url)
-        repo = self._get_repository(repo_name)
-        files = self._get_repo_files(repo)
+        repo_name = self._extract_repo_name(str(repo_url))
+        repo = await self._get_repository(repo_name)
+        ref = repo.get("default_branch") or "HEAD"
+        tree = await self._get_repo_tree(repo_name, ref)
+
+        count = 0
+        async for file in self._process_files(repo_name, ref, tree):
+            count += 1
+            yield file
+        log_info(f"Fetched {count} files from repository {repo_name}")
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _extract_repo_name(repo_url: str) -> str:
+        """
+        Extracts the "owner/repo" name from the GitHub URL with GITHUB_REPO_RE. Trailing path
+        segments such as /tree/<branch> and a .git suffix are ignored. Results are memoized per
+        URL.
 
-        all_files = self._process_files(repo, files)
-        log_info(f"Fetched {len(all_files)} files from repository {repo_name}")
-        return all_files
+        Args:
+            repo_url (str): The GitHub repository URL.
+
+        Returns:
+            str: The repository name. An HTTPException with status 422 is raised when the URL does
+                 not name an owner and a repository on github.com.
+
+        """
+        match = GITHUB_REPO_RE.match(repo_url)
+        if not match:
+            log_error(f"Invalid GitHub repository URL: {repo_url}")
+            raise HTTPException(status_code=422,
+                                detail=f"Invalid GitHub repository URL: {repo_url}")
+        return f"{match.group(1)}/{match.group(2)}"
+
+    def _select_token(self) -> int:
+        """
+        Picks the next token in round-robin order, skipping tokens that are rate limited or low on
+        budget. When every usable token is low on budget, the one with the most calls left is
+        used; when all tokens are rate limited, the one that resets first.
+
+        Returns:
+            int: Index of the token in self.tokens.
 
-    def _extract_repo_name(self, repo_url: HttpUrl) -> str:
         """
-        Extracts the repository name from the GitHub URL.
+        now = time.time()
+        low = []
+        for _ in range(len(self.tokens)):
+            index = next(self._token_cycle)
+            if self._rate_limited_until.get(index, 0) > now:
+                continue
+            budget = self._low_budget.get(index)
+            if budget is None or budget[1] <= now:
+                self._low_budget.pop(index, None)
+                return index
+            low.append(index)
+        if low:
+            return max(low, key=lambda index: self._low_budget[index][0])
+        return min(self._rate_limited_until, key=self._rate_limited_until.get)
+
+    async def _acquire_token(self) -> int:
+        """
+        Waits for the client-side request budget, then picks a token. When every token is rate
+        limited and the earliest reset is at most MAX_RATE_LIMIT_WAIT seconds away, waits for it
+        instead of letting GitHub reject the request; when the reset is further away, fails with
+        429 without sending anything. A token whose remaining budget dropped below
+        RATE_LIMIT_LOW_WATERMARK is only picked when every other token is low as well; its
+        remaining calls are then spread evenly until the reset, each delay capped at
+        MAX_RATE_LIMIT_WAIT.
+
+        Returns:
+            int: Index of the token in self.tokens.
+
+        """
+        await self._limiter.acquire()
+        index = self._select_token()
+        wait = self._rate_limited_until.get(index, 0) - time.time()
+        if wait > MAX_RATE_LIMIT_WAIT:
+            log_warning(f"All GitHub API tokens are rate limited for another {wait:.0f}s.")
+            raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded.")
+        if wait > 0:
+            log_warning(f"All GitHub API tokens are rate limited. Waiting {wait:.0f}s.")
+            await asyncio.sleep(wait)
+        elif index in self._low_budget:
+            remaining, reset = self._low_budget[index]
+            delay = min((reset - time.time()) / max(remaining, 1), MAX_RATE_LIMIT_WAIT)
+            if delay > 0:
+                log_debug("GitHub API token #%d is low on budget. Pacing for %.1fs.", index, delay)
+                await asyncio.sleep(delay)
+        return index
+
+    def _has_available_token(self) -> bool:
+        """
+        Checks whether any token is currently not rate limited.
+
+        Returns:
+            bool: True if at least one token can be used right away.
+
+        """
+        now = time.time()
+        return any(self._rate_limited_until.get(index, 0) <= now
+                   for index in range(len(self.tokens)))
+
+    def _mark_rate_limited(self, index: int, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        Takes a token out of rotation until its rate limit resets.
 
         Args:
-            repo_url (HttpUrl): The GitHub repository URL.
+            index (int): Index of the token in self.tokens.
+            headers (Optional[Mapping[str, str]]): Headers of the rate-limited response.
+
+        """
+        self._rate_limited_until[index] = _rate_limit_reset(headers)
+        log_warning(f"GitHub API token #{index} is rate limited.")
+
+    def _auth_headers(self, index: int) -> Dict[str, str]:
+        """
+        Builds the Authorization header of a token.
+
+        Args:
+            index (int): Index of the token in self.tokens.
 
         Returns:
-            str: The repository name.
+            Dict[str, str]: The headers, empty for anonymous access.
 
         """
-        repo_url_str = str(repo_url)
-        return repo_url_str.split("github.com/")[1]
+        token = self.tokens[index]
+        return {"Authorization": f"Bearer {token}"} if token else {}
 
-    def _get_repository(self, repo_name: str):
+    async def _get_repository(self, repo_name: str) -> Dict[str, Any]:
         """
-        Gets the repository from GitHub.
+        Gets the repository from GitHub. Repositories that were not found are remembered for
+        NOT_FOUND_CACHE_TTL seconds, so repeated requests for a mistyped URL are rejected without
+        spending rate limit.
 
         Args:
             repo_name (str): The name of the repository.
 
         Returns:
-            Repository: The GitHub repository object.
+            Dict[str, Any]: The repository metadata.
 
         """
+        detail = _NOT_FOUND_CACHE.get(repo_name)
+        if detail is not None:
+            raise HTTPException(status_code=404, detail=detail)
         try:
-            return self.github.get_repo(repo_name)
-        except RateLimitExceededException:
-            log_warning("GitHub API rate limit exceeded.")
-            raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded.")
-        except GithubException as e:
-            if e.status == 404:
-                log_error(f"Repository not found: {str(e)}")
-                raise HTTPException(status_code=404, detail=f"Repository not found: {str(e)}")
-            log_error(f"Error fetching repository: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Error fetching repository: {str(e)}")
-        except Exception as e:
-            log_error(f"Unexpected error: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+            return await self._cached_get(f"/repos/{repo_name}", "repository")
+        except HTTPException as e:
+            if e.status_code == 404:
+                _NOT_FOUND_CACHE[repo_name] = e.detail
+            raise
 
-    def _get_repo_files(self, repo) -> list:
+    async def _cached_get(self, url: str, description: str) -> Any:
         """
-        Retrieves the contents (files) of the repository.
+        Sends a conditional GET to the GitHub API. The ETag of an earlier response is sent as
+        If-None-Match, and on 304 Not Modified the cached body is reused, so unchanged data is
+        neither transferred again nor counted against the primary rate limit. Bodies are cached
+        as raw bytes, up to ETAG_CACHE_BYTES in total, and parsed again on reuse.
+        A request rejected by the rate limit is retried with another token while one is
+        available, so a single exhausted token does not fail the review.
 
         Args:
-            repo (Repository): The GitHub repository object.
+            url (str): The API URL, relative to GITHUB_API_URL.
+            description (str): What is being fetched, for error messages.
 
         Returns:
-            list: A list of file objects in the repository.
+            Any: The parsed JSON body, decoded with orjson when it is installed.
 
         """
+        cached = _ETAG_CACHE.get(url)
+        while True:
+            index = await self._acquire_token()
+            headers = self._auth_headers(index)
+            if cached:
+                headers["If-None-Match"] = cached[0]
+            try:
+                response = await self.client.get(url, headers=headers)
+            except httpx.RequestError as e:
+                log_error(f"Failed to communicate with GitHub: {str(e)}")
+                raise HTTPException(status_code=502,
+                                    detail=f"Failed to communicate with GitHub: {str(e)}")
+            if (response.status_code not in (403, 429)
+                    or response.headers.get("X-RateLimit-Remaining") != "0"):
+                break
+            self._mark_rate_limited(index, response.headers)
+            if not self._has_available_token():
+                log_warning("GitHub API rate limit exceeded.")
+                raise HTTPException(status_code=429, detail="GitHub API rate limit exceeded.")
+            log_warning("Retrying the GitHub request with another token.")
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining and remaining.isdigit() and int(remaining) < RATE_LIMIT_LOW_WATERMARK:
+            self._low_budget[index] = (int(remaining), _rate_limit_reset(response.headers))
+        elif remaining:
+            self._low_budget.pop(index, None)
+        if response.status_code == 304 and cached:
+            _ETAG_CACHE[url] = cached
+            return loads(cached[1])
+        if response.status_code == 404:
+            message = f"{description[:1].upper()}{description[1:]} not found: {response.text}"
+            log_error(message)
+            raise HTTPException(status_code=404, detail=message)
+        if response.status_code != 200:
+            log_error(f"Error fetching {description}: {response.status_code} - {response.text}")
+            raise HTTPException(status_code=500, detail=f"Error fetching {description}: "
+                                                        f"{response.status_code} {response.text}")
+        etag = response.headers.get("ETag")
+        if etag:
+            _ETAG_CACHE[url] = (etag, response.content)
+        return loads(response.content)
+
+    async def _get_repo_tree(self, repo_name: str, ref: str) -> List[Dict[str, Any]]:
+        """
+        Retrieves the full file listing of the repository with a single recursive git tree
+        request, which costs one API call however many directories the repository has.
+
+        Args:
+            repo_name (str): The name of the repository.
+            ref (str): The branch to list.
+
+        Returns:
+            List[Dict[str, Any]]: The tree entries (path, type, sha and size of every object).
+
+        """
+        tree = await self._cached_get(
+            f"/repos/{repo_name}/git/trees/{quote(ref, safe='')}?recursive=1",
+            "repository contents")
+        if tree.get("truncated"):
+            log_warning(f"Git tree of {repo_name} is truncated by GitHub; only "
+                        f"{len(tree['tree'])} entries will be reviewed.")
+        return tree["tree"]
+
+    async def _process_files(self, repo_name: str, ref: str,
+                             tree: List[Dict[str, Any]]) -> AsyncIterator[FileInfo]:
+        """
+        Downloads the reviewable blobs of the tree concurrently, at most MAX_CONCURRENT_DOWNLOADS
+        at a time, and yields each file as its download completes. Downloads still in flight are
+        cancelled when the caller stops iterating or a download fails.
+
+        Args:
+            repo_name (str): The name of the repository.
+            ref (str): The branch the tree was listed from.
+            tree (List[Dict[str, Any]]): The tree entries of the repository.
+
+        Returns:
+            AsyncIterator[FileInfo]: The files of the repository.
+
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        pending: Dict[str, asyncio.Task] = {}
+        tasks = [asyncio.ensure_future(self._fetch_blob(repo_name, ref, entry, semaphore, pending))
+                 for entry in tree if self._is_reviewable(entry)]
         try:
-            return repo.get_contents("")
-        except GithubException as e:
-            log_error(f"Error fetching repository contents: {str(e)}")
-            raise HTTPException(status_code=500,
-                                detail=f"Error fetching repository contents: {str(e)}")
-        except Exception as e:
-            log_error(f"Unexpected error: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
-
-    def _process_files(self, repo, files: list) -> list[FileInfo]:
-        all_files = []
-        while files:
-            file_content = files.pop(0)
-            if file_content.type == "dir":
-                files.extend(repo.get_contents(file_content.path))
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _is_reviewable(self, entry: Dict[str, Any]) -> bool:
+        """
+        Checks whether a tree entry is a source file worth reviewing, so that binaries, lockfiles
+        and vendored or generated code are skipped before any blob is downloaded.
+
+        Args:
+            entry (Dict[str, Any]): The tree entry of the file.
+
+        Returns:
+            bool: True if the entry is a blob with an allowed suffix outside of SKIP_DIRS.
+
+        """
+        if entry["type"] != "blob":
+            return False
+        *dirs, name = entry["path"].split("/")
+        if SKIP_DIRS.intersection(dirs):
+            return False
+        return os.path.splitext(name)[1] in ALLOWED_SUFFIXES
+
+    async def _fetch_blob(self, repo_name: str, ref: str, entry: Dict[str, Any],
+                          semaphore: asyncio.Semaphore,
+                          pending: Dict[str, asyncio.Task]) -> FileInfo:
+        """
+        Downloads and decodes a single file of the repository. Files larger than MAX_CONTENT_SIZE
+        are streamed to disk instead of being loaded into memory.
+
+        Args:
+            repo_name (str): The name of the repository.
+            ref (str): The branch the tree was listed from.
+            entry (Dict[str, Any]): The tree entry of the file.
+            semaphore (asyncio.Semaphore): Caps the number of downloads in flight.
+            pending (Dict[str, asyncio.Task]): Downloads in flight for this tree, by blob SHA.
+
+        Returns:
+            FileInfo: The file information.
+
+        """
+        async with semaphore:
+            if entry.get("size", 0) > MAX_CONTENT_SIZE:
+                content = await self._save_large_file(repo_name, ref, entry["path"])
             else:
-                content = self._get_file_content(file_content)
-                file_info = FileInfo(
-                    name=file_content.name,
-                    path=file_content.path,
-                    content=content
-                )
-                all_files.append(file_info)
-        return all_files
+                content = await self._get_blob_content(repo_name, ref, entry, pending)
+        return FileInfo(
+            name=os.path.basename(entry["path"]),
+            path=entry["path"],
+            content=content
+        )
+
+    async def _get_blob_content(self, repo_name: str, ref: str, entry: Dict[str, Any],
+                                pending: Dict[str, asyncio.Task]) -> str:
+        """
+        Returns the decoded content of a blob, downloading it only once. Git blob SHAs are content
+        hashes, so files with the same SHA are identical: they share one download within a tree,
+        and the decoded content is kept in _BLOB_CACHE, up to BLOB_CACHE_BYTES in total, for later
+        requests. The raw host serves the branch rather than the blob, so a download is only cached
+        when its Git blob SHA matches the tree entry; stale CDN content or a branch that moved
+        after the tree was listed is used for this review but never cached.
 
-    def _get_file_content(self, file_content) -> str:
+        Args:
+            repo_name (str): The name of the repository.
+            ref (str): The branch the tree was listed from.
+            entry (Dict[str, Any]): The tree entry of the file.
+            pending (Dict[str, asyncio.Task]): Downloads in flight for this tree, by blob SHA.
+
+        Returns:
+            str: The content of the file.
+
+        """
+        sha = entry["sha"]
+        content = _BLOB_CACHE.get(sha)
+        if content is None:
+            if sha not in pending:
+                pending[sha] = asyncio.ensure_future(
+                    self._download_file(repo_name, ref, entry["path"]))
+            data = await pending[sha]
+            content = self._get_file_content(data)
+            if _git_blob_sha(data) == sha:
+                _BLOB_CACHE[sha] = content
+            else:
+                log_warning(f"Downloaded {entry['path']} does not match blob {sha}; "
+                            "not caching it.")
+        return content
+
+    async def _download_file(self, repo_name: str, ref: str, path: str) -> bytes:
+        """
+        Downloads the raw bytes of a file from raw.githubusercontent.com. Unlike the blob API, the
+        raw host serves the file without base64 encoding and does not count against the API rate
+        limit, so no request budget is acquired; the token is only sent for private repositories.
+
+        Args:
+            repo_name (str): The name of the repository.
+            ref (str): The branch to download the file from.
+            path (str): The path of the file in the repository.
+
+        Returns:
+            bytes: The raw content of the file.
+
+        """
+        raw_url = _raw_url(repo_name, ref, path)
+        headers = self._auth_headers(self._select_token())
+        try:
+            response = await self.client.get(raw_url, headers=headers)
+        except httpx.RequestError as e:
+            log_error(f"Failed to communicate with GitHub: {str(e)}")
+            raise HTTPException(status_code=502,
+                                detail=f"Failed to communicate with GitHub: {str(e)}")
+        if response.status_code == 404:
+            log_error(f"File not found: {path}")
+            raise HTTPException(status_code=404, detail=f"File not found: {path}")
+        if response.status_code != 200:
+            log_error(f"Error fetching file {path}: {response.status_code} - {response.text}")
+            raise HTTPException(status_code=500, detail=f"Error fetching file {path}: "
+                                                        f"{response.status_code} {response.text}")
+        return response.content
+
+    def _get_file_content(self, data: bytes) -> str:
         """
-        Retrieves the content of a file. If the file is large, it saves it to disk.
+        Decodes the raw content of a file. Invalid UTF-8 sequences are replaced rather than
+        failing the whole review.
 
         Args:
-            file_content (ContentFile): The file object from GitHub.
+            data (bytes): The raw content of the file.
 
         Returns:
-            str: The content of the file, either in raw format or a message indicating the file was
-                 saved.
+            str: The content of the file.
 
         """
-        if file_content.size > MAX_CONTENT_SIZE:
-            return self._save_large_file(file_content)
-        else:
-            return file_content.decoded_content.decode("utf-8")
+        return data.decode("utf-8", errors="replace")
 
-    def _save_large_file(self, file_content) -> str:
+    async def _save_large_file(self, repo_name: str, ref: str, path: str) -> str:
         """
-        Saves a large file to disk if its size exceeds MAX_CONTENT_SIZE.
+        Streams a file whose size exceeds MAX_CONTENT_SIZE from raw.githubusercontent.com to disk,
+        one LARGE_FILE_CHUNK_SIZE chunk at a time. Chunks are written straight to an unbuffered file
+        descriptor, and the disk I/O runs in the bounded file I/O pool so a slow write never
+        stalls the event loop.
 
         Args:
-            file_content (ContentFile): The file object from GitHub.
+            repo_name (str): The name of the repository.
+            ref (str): The branch to download the file from.
+            path (str): The path of the file in the repository.
 
         Returns:
             str: A message indicating the file has been saved.
 
         """
         try:
-            file_path = os.path.join("/tmp", file_content.path)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, "wb") as f:
-                f.write(file_content.decoded_content)
+            file_path = os.path.join(LARGE_FILE_DIR, path)
+            await _run_in_pool(os.makedirs, os.path.dirname(file_path), exist_ok=True)
+            raw_url = _raw_url(repo_name, ref, path)
+            headers = self._auth_headers(self._select_token())
+            async with self.client.stream("GET", raw_url, headers=headers) as response:
+                response.raise_for_status()
+                fd = await _run_in_pool(os.open, file_path, _LARGE_FILE_FLAGS, 0o644)
+                try:
+                    async for chunk in response.aiter_bytes(LARGE_FILE_CHUNK_SIZE):
+                        await _run_in_pool(_write_all, fd, chunk)
+                finally:
+                    await _run_in_pool(os.close, fd)
             return f"File content saved to {file_path}"
         except Exception as e:
             log_error(f"Error saving file: {str(e)}")
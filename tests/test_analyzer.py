@@ -0,0 +1,224 @@
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from src.analyzer import _RESULT_CACHE, CodeAnalyzer
+from src.repo_fetcher import FileInfo
+
+FILE = FileInfo(name="main.py", path="main.py", content="print('Hello')")
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """
+    Fixture that isolates tests from reviews cached by earlier tests.
+    """
+    _RESULT_CACHE.clear()
+    yield
+    _RESULT_CACHE.clear()
+
+
+@pytest.fixture
+def analyzer():
+    """
+    Fixture providing a CodeAnalyzer without files, for exercising the parsing helpers.
+    """
+    return CodeAnalyzer([], "Check security of code", "Junior", client=None)
+
+
+def test_extract_section_heading(analyzer):
+    """
+    Test that a heading section is extracted up to the next marker-prefixed line.
+    """
+    text = "Intro\n### Rating: 8/10\nSolid code.\n### Conclusion\nGood job.\n- Extra note"
+
+    assert analyzer.extract_section(text, "Rating") == "8/10\nSolid code."
+    assert analyzer.extract_section(text, "Conclusion") == "Good job."
+
+
+def test_extract_section_bold_marker(analyzer):
+    """
+    Test that bold section headers have their trailing markup removed.
+    """
+    assert analyzer.extract_section("**Rating:** 7/10", "Rating") == "7/10"
+
+
+@pytest.mark.parametrize("line", [
+    "- **Rating:** 7/10",
+    "### **Rating:** 7/10",
+    "1. **Rating**: 7/10",
+    "#### Rating: 7/10",
+    "###Rating: 7/10",
+    "- Rating: 7/10",
+])
+def test_extract_section_nested_markers(analyzer, line):
+    """
+    Test that headers with nested emphasis, deeper headings or list numbering are recognised.
+    """
+    text = f"Intro\n{line}\n- Conclusion: Fine."
+
+    assert analyzer.extract_section(text, "Rating") == "7/10"
+
+
+def test_extract_section_missing(analyzer):
+    """
+    Test the default message when the section is not present.
+    """
+    assert analyzer.extract_section("No sections here", "Rating") == "No rating available"
+
+
+@pytest.mark.asyncio
+async def test_start_caches_identical_prompts():
+    """
+    Test that a repeated review with the same prompt does not call the AI service again.
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"openai": {"generated_text": "### Rating: 9/10"}})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        first = await CodeAnalyzer([FILE], "Cache me", "Senior", client).start()
+        second = await CodeAnalyzer([FILE], "Cache me", "Senior", client).start()
+
+    assert len(calls) == 1
+    assert first == second
+    assert first["Rating"] == "9/10"
+
+
+@pytest.mark.asyncio
+async def test_start_retries_after_rate_limit(mocker):
+    """
+    Test that a 429 response is retried after the delay given by the Retry-After header.
+    """
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "2"}),
+        httpx.Response(200, json={"openai": {"generated_text": "### Conclusion\nFine."}}),
+    ]
+    sleep = mocker.patch("src.analyzer.asyncio.sleep")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda _: responses.pop(0))) as client:
+        result = await CodeAnalyzer([FILE], "Retry me", "Middle", client).start()
+
+    sleep.assert_awaited_once_with(2.0)
+    assert result["Conclusion"] == "Fine."
+
+
+@pytest.mark.asyncio
+async def test_start_network_error_returns_bad_gateway():
+    """
+    Test that a transport failure is reported as a 502 instead of an internal error.
+    """
+    def handler(request):
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(HTTPException) as exc_info:
+            await CodeAnalyzer([FILE], "Unreachable", "Junior", client).start()
+
+    assert exc_info.value.status_code == 502
+
+
+@pytest.mark.asyncio
+async def test_start_reviews_files_concurrently_and_merges():
+    """
+    Test that each file gets its own AI request and the ratings are averaged.
+    """
+    ratings = {"a.py": "8/10", "b.py": "3 out of 5"}
+
+    def handler(request):
+        name = next(name for name in ratings if name in request.content.decode())
+        text = f"### Rating: {ratings[name]}\n### Conclusion\nReviewed {name}."
+        return httpx.Response(200, json={"openai": {"generated_text": text}})
+
+    files = [FileInfo(name=name, path=name, content="pass") for name in ratings]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await CodeAnalyzer(files, "Merge me", "Junior", client).start()
+
+    assert result["Found files"] == ["a.py", "b.py"]
+    assert result["Rating"] == "7.0/10"
+    assert result["Conclusion"] == "a.py:\nReviewed a.py.\n\nb.py:\nReviewed b.py."
+
+
+@pytest.mark.asyncio
+async def test_start_orders_files_by_path():
+    """
+    Test that the report lists files in path order whatever order they were passed in.
+    """
+    def handler(request):
+        return httpx.Response(200, json={"openai": {"generated_text": "### Rating: 5/10"}})
+
+    files = [FileInfo(name=name, path=f"src/{name}", content=name) for name in ("b.py", "a.py")]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await CodeAnalyzer(files, "Order me", "Junior", client).start()
+
+    assert result["Found files"] == ["a.py", "b.py"]
+    assert result["Downsides/Comments"].index("a.py:") < result["Downsides/Comments"].index("b.py:")
+
+
+@pytest.mark.asyncio
+async def test_start_labels_sole_surviving_review():
+    """
+    Test that when only one of several file reviews succeeds, its sections keep the file label.
+    """
+    def handler(request):
+        if "b.py" in request.content.decode():
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json={"openai": {
+            "generated_text": "### Rating: 8/10\n### Conclusion\nGood."}})
+
+    files = [FileInfo(name=name, path=name, content="pass") for name in ("a.py", "b.py")]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await CodeAnalyzer(files, "Partial", "Junior", client).start()
+
+    assert result["Conclusion"] == "a.py:\nGood."
+    assert result["Rating"] == "8.0/10"
+
+
+@pytest.mark.asyncio
+async def test_start_rejects_oversized_prompt():
+    """
+    Test that a prompt beyond the token budget fails with 413 without calling the AI service.
+    """
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={})
+
+    huge = FileInfo(name="huge.py", path="huge.py", content="x" * (4 * 120_000 + 4))
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with pytest.raises(HTTPException) as exc_info:
+            await CodeAnalyzer([huge], "Too big", "Junior", client).start()
+
+    assert exc_info.value.status_code == 413
+    assert not calls
+
+
+@pytest.mark.asyncio
+async def test_start_invalid_json_response():
+    """
+    Test that a malformed AI response body is reported as an invalid response format.
+    """
+    transport = httpx.MockTransport(lambda _: httpx.Response(200, content=b"not json"))
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(HTTPException) as exc_info:
+            await CodeAnalyzer([FILE], "Broken", "Junior", client).start()
+
+    assert exc_info.value.status_code == 500
+    assert exc_info.value.detail.startswith("Invalid response format from AI service")
+
+
+@pytest.mark.asyncio
+async def test_start_rejects_oversized_response(mocker):
+    """
+    Test that a response larger than the buffering limit is aborted with 502.
+    """
+    mocker.patch("src.analyzer.MAX_RESPONSE_SIZE", 16)
+    transport = httpx.MockTransport(lambda _: httpx.Response(200, content=b"x" * 17))
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(HTTPException) as exc_info:
+            await CodeAnalyzer([FILE], "Flood", "Junior", client).start()
+
+    assert exc_info.value.status_code == 502
@@ -0,0 +1,47 @@
+from src.cache import TTLCache
+
+
+def test_ttl_cache_expires_entries(mocker):
+    """
+    Test that an entry is dropped once its time to live has passed.
+    """
+    now = mocker.patch("src.cache.time.monotonic", return_value=100.0)
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache["key"] = "value"
+
+    assert cache.get("key") == "value"
+    now.return_value = 110.0
+    assert "key" not in cache
+    assert cache.get("key", "default") == "default"
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """
+    Test that the least recently used entry is evicted when the cache is full.
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache["a"] = 1
+    cache["b"] = 2
+    cache.get("a")
+    cache["c"] = 3
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert len(cache) == 2
+
+
+def test_ttl_cache_bounds_total_size():
+    """
+    Test that getsizeof makes maxsize a bound on the total size, and that a value larger than
+    maxsize is not cached.
+    """
+    cache = TTLCache(maxsize=10, ttl=60, getsizeof=len)
+    cache["a"] = "x" * 4
+    cache["b"] = "x" * 4
+    cache["c"] = "x" * 4
+    cache["huge"] = "x" * 11
+
+    assert "a" not in cache
+    assert "b" in cache and "c" in cache
+    assert "huge" not in cache
+    assert cache.currsize == 8
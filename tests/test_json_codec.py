@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from src import json_codec
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_round_trip(mocker, use_orjson):
+    """
+    Test that dumps and loads round-trip with and without orjson installed.
+    """
+    if not use_orjson:
+        mocker.patch.object(json_codec, "orjson", None)
+    obj = {"tree": [{"path": "src/app.py", "size": 14}], "truncated": False}
+
+    data = json_codec.dumps(obj)
+
+    assert isinstance(data, bytes)
+    assert json_codec.loads(data) == obj
+
+
+def test_loads_invalid_json_raises_json_decode_error():
+    """
+    Test that invalid input raises json.JSONDecodeError whichever parser is used.
+    """
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads(b"not json")
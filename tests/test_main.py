@@ -1,28 +1,44 @@
-from unittest.mock import Mock, patch
+from contextlib import asynccontextmanager
 
+import httpx
 import pytest
 from fastapi import HTTPException
 from httpx import ASGITransport, AsyncClient
 
+from src.analyzer import _RESULT_CACHE
 from src.main import app
-from src.repo_fetcher import GitHubRepositoryFetcher
+from src.repo_fetcher import (_BLOB_CACHE, _ETAG_CACHE, _NOT_FOUND_CACHE, GITHUB_API_URL,
+                              GitHubRepositoryFetcher)
+from tests.test_repo_fetcher import github_handler
 
 
-@pytest.fixture
-def mock_github_repo(mocker):
+def ai_handler(request):
     """
-    Fixture to mock the GitHub repository fetcher for various test cases.
+    Answers every prompt like the AI service, with a fixed rating and conclusion.
     """
-    mock_repo = Mock()
-    mock_file = Mock()
-    mock_file.name = "test.py"
-    mock_file.path = "test.py"
-    mock_file.size = 50
-    mock_file.decoded_content = b"print('Hello')"
-    mock_repo.get_contents = Mock(return_value=[mock_file])
+    return httpx.Response(200, json={"openai": {
+        "generated_text": "### Rating: 8/10\nClean code.\n### Conclusion\nWell done."}})
+
 
-    mocker.patch.object(GitHubRepositoryFetcher, '_get_repository', return_value=mock_repo)
-    return mock_repo
+@asynccontextmanager
+async def mocked_app():
+    """
+    Runs the application lifespan with the GitHub and AI clients on app.state served by
+    MockTransport, and yields an HTTP client for the application.
+    """
+    for cache in (_ETAG_CACHE, _NOT_FOUND_CACHE, _BLOB_CACHE, _RESULT_CACHE):
+        cache.clear()
+    async with app.router.lifespan_context(app):
+        await app.state.ai_client.aclose()
+        await app.state.github_client.aclose()
+        app.state.ai_client = httpx.AsyncClient(transport=httpx.MockTransport(ai_handler))
+        app.state.github_client = httpx.AsyncClient(base_url=GITHUB_API_URL,
+                                                    transport=httpx.MockTransport(github_handler))
+        app.state.github_fetcher = GitHubRepositoryFetcher(client=app.state.github_client)
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+    for cache in (_ETAG_CACHE, _NOT_FOUND_CACHE, _BLOB_CACHE, _RESULT_CACHE):
+        cache.clear()
 
 
 @pytest.fixture
@@ -34,12 +50,11 @@ def mock_invalid_github_repo(mocker):
 
 
 @pytest.mark.asyncio
-async def test_review_code_valid_input(mock_github_repo):
+async def test_review_code_valid_input():
     """
     Test with valid input, where the GitHub repository exists and returns files.
     """
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+    async with mocked_app() as ac:
         response = await ac.post("/review", json={
             "assignment_description": "Check security of code",
             "github_repo_url": "https://github.com/example/repo",
@@ -47,7 +62,9 @@ async def test_review_code_valid_input(mock_github_repo):
         })
 
     assert response.status_code == 200
-    assert "review" in response.json()
+    review = response.json()["review"]
+    assert review["Found files"] == ["README.md", "app.py"]
+    assert review["Rating"] == "8.0/10"
 
 
 @pytest.mark.asyncio
@@ -66,6 +83,38 @@ async def test_review_code_empty_url():
     assert response.status_code == 422
 
 
+@pytest.mark.asyncio
+async def test_review_code_non_https_url():
+    """
+    Test with invalid input: GitHub URL that does not use https.
+    """
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post("/review", json={
+            "assignment_description": "Check security of code",
+            "github_repo_url": "http://github.com/example/repo",
+            "candidate_level": "Junior"
+        })
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_review_code_url_without_repository():
+    """
+    Test with invalid input: GitHub URL that names no repository.
+    """
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        response = await ac.post("/review", json={
+            "assignment_description": "Check security of code",
+            "github_repo_url": "https://github.com/example",
+            "candidate_level": "Junior"
+        })
+
+    assert response.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_review_code_with_empty_assignment():
     transport = ASGITransport(app=app)
@@ -84,7 +133,8 @@ async def test_review_code_repo_not_found(mock_invalid_github_repo):
     Test with a non-existent GitHub repository URL.
     """
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+    async with app.router.lifespan_context(app), \
+            AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post("/review", json={
             "assignment_description": "Check security of code",
             "github_repo_url": "https://github.com/nonexistent/repo",
@@ -101,7 +151,8 @@ async def test_review_code_repo_not_found(mocker):
     mocker.patch.object(GitHubRepositoryFetcher, '_get_repository', side_effect=HTTPException(status_code=404, detail="Repository not found"))
 
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+    async with app.router.lifespan_context(app), \
+            AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post("/review", json={
             "assignment_description": "Check security of code",
             "github_repo_url": "https://github.com/nonexistent/repo",
@@ -121,7 +172,8 @@ async def test_review_code_value_error(mocker):
     mocker.patch.object(GitHubRepositoryFetcher, 'fetch_repo_contents', side_effect=ValueError("Invalid input"))
 
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+    async with app.router.lifespan_context(app), \
+            AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post("/review", json={
             "assignment_description": "Check security of code",
             "github_repo_url": "https://github.com/example/repo",
@@ -141,7 +193,8 @@ async def test_review_code_internal_server_error(mocker):
     mocker.patch.object(GitHubRepositoryFetcher, 'fetch_repo_contents', side_effect=Exception("Some unexpected error"))
 
     transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+    async with app.router.lifespan_context(app), \
+            AsyncClient(transport=transport, base_url="http://test") as ac:
         response = await ac.post("/review", json={
             "assignment_description": "Check security of code",
             "github_repo_url": "https://github.com/example/repo",
@@ -150,3 +203,15 @@ async def test_review_code_internal_server_error(mocker):
 
     assert response.status_code == 500
     assert response.json()["detail"] == "Internal server error: Some unexpected error"
+
+
+@pytest.mark.asyncio
+async def test_lifespan_shares_github_client():
+    """
+    Test that the lifespan injects one shared GitHub client into the fetcher and closes it on
+    shutdown.
+    """
+    async with app.router.lifespan_context(app):
+        assert app.state.github_fetcher.client is app.state.github_client
+
+    assert app.state.github_client.is_closed
@@ -0,0 +1,21 @@
+import ast
+from collections import Counter
+
+import pytest
+
+import src.analyzer
+import src.main
+import src.repo_fetcher
+
+
+@pytest.mark.parametrize("module", [src.analyzer, src.main, src.repo_fetcher])
+def test_no_duplicate_class_names(module):
+    """
+    Test that no class is defined twice in a module, where the later definition would silently
+    shadow the earlier one.
+    """
+    with open(module.__file__, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    counts = Counter(node.name for node in tree.body if isinstance(node, ast.ClassDef))
+
+    assert [name for name, count in counts.items() if count > 1] == []
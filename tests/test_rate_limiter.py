@@ -0,0 +1,26 @@
+import pytest
+
+from src.rate_limiter import AsyncRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_once_budget_is_spent(mocker):
+    """
+    Test that acquisitions within the budget are immediate and the next one waits for capacity.
+    """
+    clock = [0.0]
+    mocker.patch("src.rate_limiter.time.monotonic", side_effect=lambda: clock[0])
+
+    async def fake_sleep(delay):
+        clock[0] += delay
+
+    sleep = mocker.patch("src.rate_limiter.asyncio.sleep", side_effect=fake_sleep)
+    limiter = AsyncRateLimiter(max_rate=2, time_period=10)
+
+    await limiter.acquire()
+    async with limiter:
+        pass
+    sleep.assert_not_called()
+
+    await limiter.acquire()
+    sleep.assert_awaited_once_with(5.0)
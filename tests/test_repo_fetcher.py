@@ -0,0 +1,405 @@
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from src import repo_fetcher
+from src.repo_fetcher import (_BLOB_CACHE, _ETAG_CACHE, _NOT_FOUND_CACHE, GITHUB_API_URL,
+                              FileInfo, GitHubRepositoryFetcher, _git_blob_sha)
+
+FILES = {
+    "README.md": b"# Example",
+    "src/app.py": b"print('Hello')",
+}
+SKIPPED = ["logo.png", "poetry.lock", "node_modules/lib/index.js", "web/dist/bundle.js"]
+
+
+def github_handler(request):
+    """
+    Serves a recursive git tree like the GitHub REST API, and the files referenced by it like
+    raw.githubusercontent.com. Every response carries an ETag derived from the path, and a
+    matching If-None-Match yields 304.
+    """
+    path = request.url.path
+    etag = f'"{path}"'
+    if request.headers.get("If-None-Match") == etag:
+        return httpx.Response(304)
+    response = github_response(path)
+    response.headers["ETag"] = etag
+    return response
+
+
+def github_response(path):
+    """
+    Builds the full GitHub API response for the given path.
+    """
+    if path == "/repos/example/repo":
+        return httpx.Response(200, json={"full_name": "example/repo", "default_branch": "main"})
+    if path == "/repos/example/repo/git/trees/main":
+        tree = [{"path": "src", "type": "tree", "sha": "dir"}]
+        tree += [{"path": name, "type": "blob", "sha": _git_blob_sha(data), "size": len(data)}
+                 for name, data in FILES.items()]
+        tree += [{"path": name, "type": "blob", "sha": name, "size": 1} for name in SKIPPED]
+        return httpx.Response(200, json={"tree": tree, "truncated": False})
+    if path.startswith("/example/repo/main/"):
+        return httpx.Response(200, content=FILES[path.split("/main/", 1)[1]])
+    return httpx.Response(404, json={"message": "Not Found"})
+
+
+async def fetch_all(fetcher, repo_url):
+    """
+    Collects every file yielded by fetch_repo_contents.
+    """
+    return [file async for file in fetcher.fetch_repo_contents(repo_url)]
+
+
+@pytest.fixture
+def requests_seen():
+    """
+    Fixture collecting the (path, status code) of every request served by github_handler.
+    """
+    return []
+
+
+@pytest_asyncio.fixture
+async def fetcher(requests_seen):
+    """
+    Fixture providing a fetcher whose injected GitHub client is served by github_handler.
+    """
+    def handler(request):
+        response = github_handler(request)
+        requests_seen.append((request.url.path, response.status_code))
+        return response
+
+    _ETAG_CACHE.clear()
+    _NOT_FOUND_CACHE.clear()
+    _BLOB_CACHE.clear()
+    async with httpx.AsyncClient(base_url=GITHUB_API_URL,
+                                 transport=httpx.MockTransport(handler)) as client:
+        yield GitHubRepositoryFetcher(client=client)
+    _ETAG_CACHE.clear()
+    _NOT_FOUND_CACHE.clear()
+    _BLOB_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_reads_all_blobs(fetcher, requests_seen):
+    """
+    Test that every blob of the tree is downloaded from the raw host and decoded, while
+    directories are skipped.
+    """
+    files = await fetch_all(fetcher, "https://github.com/example/repo")
+
+    assert sorted(files) == [
+        FileInfo(name="README.md", path="README.md", content="# Example"),
+        FileInfo(name="app.py", path="src/app.py", content="print('Hello')"),
+    ]
+    assert ("/example/repo/main/src/app.py", 200) in requests_seen
+    assert not [path for path, _ in requests_seen if "/git/blobs/" in path]
+
+
+@pytest.mark.asyncio
+async def test_get_file_content_replaces_invalid_utf8(fetcher):
+    """
+    Test that undecodable bytes are replaced instead of failing the review.
+    """
+    assert fetcher._get_file_content(b"ok \xff") == "ok \ufffd"
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_skips_non_source_files(fetcher, requests_seen):
+    """
+    Test that binaries, lockfiles and files in SKIP_DIRS are never downloaded.
+    """
+    await fetch_all(fetcher, "https://github.com/example/repo")
+
+    assert not [path for path, _ in requests_seen if any(path.endswith(name) for name in SKIPPED)]
+
+
+@pytest.mark.parametrize("url", [
+    "https://github.com/example/repo",
+    "https://www.github.com/example/repo.git",
+    "https://github.com/example/repo/tree/main/src",
+])
+def test_extract_repo_name(url):
+    """
+    Test that the owner and repository are read from URL variants.
+    """
+    assert GitHubRepositoryFetcher._extract_repo_name(url) == "example/repo"
+
+
+def test_extract_repo_name_rejects_url_without_repo():
+    """
+    Test that a URL naming only an owner is rejected with 422.
+    """
+    with pytest.raises(HTTPException) as exc_info:
+        GitHubRepositoryFetcher._extract_repo_name("https://github.com/example")
+
+    assert exc_info.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_repo_not_found(fetcher):
+    """
+    Test that an unknown repository is reported as 404.
+    """
+    with pytest.raises(HTTPException) as exc_info:
+        await fetch_all(fetcher, "https://github.com/nonexistent/repo")
+
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail.startswith("Repository not found")
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_remembers_missing_repo(fetcher, requests_seen):
+    """
+    Test that a repository that was not found is rejected again without asking GitHub.
+    """
+    with pytest.raises(HTTPException):
+        await fetch_all(fetcher, "https://github.com/nonexistent/repo")
+    requests_seen.clear()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fetch_all(fetcher, "https://github.com/nonexistent/repo")
+
+    assert exc_info.value.status_code == 404
+    assert requests_seen == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_fails_fast_while_rate_limited(fetcher, requests_seen):
+    """
+    Test that no request is sent while every token is rate limited for longer than
+    MAX_RATE_LIMIT_WAIT.
+    """
+    fetcher._rate_limited_until[0] = time.time() + 3600
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fetch_all(fetcher, "https://github.com/example/repo")
+
+    assert exc_info.value.status_code == 429
+    assert requests_seen == []
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_paces_token_low_on_budget(mocker):
+    """
+    Test that a token below RATE_LIMIT_LOW_WATERMARK keeps serving requests, spread out until
+    its reset instead of being rejected with 429.
+    """
+    reset = time.time() + 50
+
+    def handler(request):
+        response = github_handler(request)
+        response.headers.update({"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": str(reset)})
+        return response
+
+    sleep = mocker.patch("src.repo_fetcher.asyncio.sleep")
+    _ETAG_CACHE.clear()
+    async with httpx.AsyncClient(base_url=GITHUB_API_URL,
+                                 transport=httpx.MockTransport(handler)) as client:
+        fetcher = GitHubRepositoryFetcher(client=client)
+        await fetch_all(fetcher, "https://github.com/example/repo")
+        files = await fetch_all(fetcher, "https://github.com/example/repo")
+    _ETAG_CACHE.clear()
+
+    delays = [call.args[0] for call in sleep.await_args_list]
+    assert len(files) == len(FILES)
+    assert delays and all(0 < delay <= 10 for delay in delays)
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_prefers_token_with_budget(mocker):
+    """
+    Test that a token low on budget is not paced while another token still has plenty left.
+    """
+    remaining = {"Bearer low": "50", "Bearer fresh": "4900"}
+    tokens_seen = []
+
+    def handler(request):
+        token = request.headers["Authorization"]
+        tokens_seen.append(token)
+        response = github_handler(request)
+        response.headers.update({"X-RateLimit-Remaining": remaining[token],
+                                 "X-RateLimit-Reset": str(time.time() + 3000)})
+        return response
+
+    sleep = mocker.patch("src.repo_fetcher.asyncio.sleep")
+    _ETAG_CACHE.clear()
+    async with httpx.AsyncClient(base_url=GITHUB_API_URL,
+                                 transport=httpx.MockTransport(handler)) as client:
+        fetcher = GitHubRepositoryFetcher(tokens=["low", "fresh"], client=client)
+        await fetch_all(fetcher, "https://github.com/example/repo")
+        tokens_seen.clear()
+        for _ in range(3):
+            await fetch_all(fetcher, "https://github.com/example/repo")
+    _ETAG_CACHE.clear()
+
+    assert sleep.await_count == 0
+    assert set(tokens_seen) == {"Bearer fresh"}
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_revalidates_with_etags(fetcher, requests_seen):
+    """
+    Test that a repeated fetch sends conditional API requests and reuses the cached bodies on 304.
+    """
+    first = await fetch_all(fetcher, "https://github.com/example/repo")
+    requests_seen.clear()
+    second = await fetch_all(fetcher, "https://github.com/example/repo")
+
+    api_statuses = [status for path, status in requests_seen if path.startswith("/repos/")]
+    assert sorted(second) == sorted(first)
+    assert api_statuses and all(status == 304 for status in api_statuses)
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_downloads_identical_blobs_once(fetcher, requests_seen, mocker):
+    """
+    Test that files sharing a blob SHA are downloaded once, and not again on a later fetch.
+    """
+    mocker.patch.dict(FILES, {"docs/README.md": FILES["README.md"]})
+    sha = _git_blob_sha(FILES["README.md"])
+    tree = [{"path": path, "type": "blob", "sha": sha, "size": 9}
+            for path in ("README.md", "docs/README.md")]
+    mocker.patch.object(fetcher, "_get_repo_tree", return_value=tree)
+
+    files = await fetch_all(fetcher, "https://github.com/example/repo")
+    second = await fetch_all(fetcher, "https://github.com/example/repo")
+
+    raw_downloads = [path for path, _ in requests_seen if path.startswith("/example/repo/")]
+    assert sorted(second) == sorted(files)
+    assert {file.content for file in files} == {"# Example"}
+    assert len(raw_downloads) == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_does_not_cache_stale_downloads(fetcher, requests_seen, mocker):
+    """
+    Test that a download whose content does not match the blob SHA of the tree is not cached.
+    """
+    tree = [{"path": "README.md", "type": "blob", "sha": _git_blob_sha(b"# Newer"), "size": 9}]
+    mocker.patch.object(fetcher, "_get_repo_tree", return_value=tree)
+
+    files = await fetch_all(fetcher, "https://github.com/example/repo")
+    await fetch_all(fetcher, "https://github.com/example/repo")
+
+    raw_downloads = [path for path, _ in requests_seen if path.startswith("/example/repo/")]
+    assert [file.content for file in files] == ["# Example"]
+    assert len(raw_downloads) == 2
+    assert len(_BLOB_CACHE) == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_quotes_special_characters_in_paths(fetcher, mocker):
+    """
+    Test that '#', '?' and spaces in file paths are percent-encoded in the raw download URL.
+    """
+    paths = ["docs/C#.md", "docs/why?.md", "docs/release notes.md"]
+    mocker.patch.dict(FILES, {path: path.encode() for path in paths})
+    tree = [{"path": path, "type": "blob", "sha": path, "size": len(path)} for path in paths]
+    mocker.patch.object(fetcher, "_get_repo_tree", return_value=tree)
+
+    files = await fetch_all(fetcher, "https://github.com/example/repo")
+
+    assert sorted(file.content for file in files) == sorted(paths)
+
+
+@pytest.mark.asyncio
+async def test_get_repo_tree_quotes_branch_name():
+    """
+    Test that a '#' in the branch name stays part of the tree path instead of starting a fragment.
+    """
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, request.url.params.get("recursive")))
+        return httpx.Response(200, json={"tree": [], "truncated": False})
+
+    _ETAG_CACHE.clear()
+    async with httpx.AsyncClient(base_url=GITHUB_API_URL,
+                                 transport=httpx.MockTransport(handler)) as client:
+        await GitHubRepositoryFetcher(client=client)._get_repo_tree("example/repo", "fix#12")
+
+    assert seen == [("/repos/example/repo/git/trees/fix#12", "1")]
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_streams_large_files_to_disk(fetcher, requests_seen, mocker,
+                                                               tmp_path):
+    """
+    Test that files above MAX_CONTENT_SIZE are streamed from the raw host to disk.
+    """
+    mocker.patch.object(repo_fetcher, "MAX_CONTENT_SIZE", 10)
+    mocker.patch.object(repo_fetcher, "LARGE_FILE_DIR", str(tmp_path))
+
+    files = await fetch_all(fetcher, "https://github.com/example/repo")
+
+    saved = tmp_path / "src" / "app.py"
+    assert saved.read_bytes() == FILES["src/app.py"]
+    assert FileInfo(name="app.py", path="src/app.py",
+                    content=f"File content saved to {saved}") in files
+    assert ("/example/repo/main/src/app.py", 200) in requests_seen
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_rotates_away_from_rate_limited_token():
+    """
+    Test that a request rejected for an exhausted token is retried with the other token, and that
+    the exhausted token is skipped afterwards.
+    """
+    tokens_seen = []
+
+    def handler(request):
+        tokens_seen.append(request.headers["Authorization"])
+        if request.headers["Authorization"] == "Bearer exhausted":
+            return httpx.Response(403, headers={"X-RateLimit-Remaining": "0",
+                                                "X-RateLimit-Reset": "4102444800"})
+        return github_handler(request)
+
+    _ETAG_CACHE.clear()
+    async with httpx.AsyncClient(base_url=GITHUB_API_URL,
+                                 transport=httpx.MockTransport(handler)) as client:
+        fetcher = GitHubRepositoryFetcher(tokens=["exhausted", "fresh"], client=client)
+
+        first = await fetch_all(fetcher, "https://github.com/example/repo")
+        assert len(first) == len(FILES)
+
+        tokens_seen.clear()
+        files = await fetch_all(fetcher, "https://github.com/example/repo")
+
+    assert len(files) == len(FILES)
+    assert set(tokens_seen) == {"Bearer fresh"}
+    _ETAG_CACHE.clear()
+
+
+@pytest.mark.asyncio
+async def test_create_github_client_applies_pool_limits():
+    """
+    Test that the connection pool limits reach the transport of the GitHub client.
+    """
+    async with repo_fetcher.create_github_client() as client:
+        pool = client._transport._pool
+
+        assert (pool._max_connections, pool._max_keepalive_connections) == (50, 20)
+
+
+@pytest.mark.asyncio
+async def test_fetch_repo_contents_rate_limited_without_spare_token():
+    """
+    Test that a rate limit rejection is reported as 429 when no other token is available.
+    """
+    def handler(request):
+        return httpx.Response(403, headers={"X-RateLimit-Remaining": "0",
+                                            "X-RateLimit-Reset": "4102444800"})
+
+    async with httpx.AsyncClient(base_url=GITHUB_API_URL,
+                                 transport=httpx.MockTransport(handler)) as client:
+        fetcher = GitHubRepositoryFetcher(tokens=["exhausted"], client=client)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await fetch_all(fetcher, "https://github.com/example/repo")
+
+    assert exc_info.value.status_code == 429